@@ -1,7 +1,11 @@
+from rubin.analyzer import warmup
+from rubin.evaluator import preload_styles
 from rubin.server import mcp
 
 
 def main():
+    warmup()
+    preload_styles()
     mcp.run()
 
 
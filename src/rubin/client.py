@@ -1,10 +1,23 @@
 import socket
 import struct
 import sys
+import threading
 from abc import ABC, abstractmethod
 
 import numpy as np
 
+# Block in recv until the full request is buffered, where the platform allows
+_MSG_WAITALL = getattr(socket, "MSG_WAITALL", 0)
+
+
+def _deinterleave(samples: np.ndarray) -> np.ndarray:
+    """Split interleaved stereo samples into C-contiguous (channels, samples) rows."""
+    frames = samples.size // 2
+    out = np.empty((2, frames), dtype=np.float32)
+    out[0] = samples[0 : 2 * frames : 2]
+    out[1] = samples[1 : 2 * frames : 2]
+    return out
+
 
 class AudioClient(ABC):
     """Captures audio and returns raw PCM buffers."""
@@ -32,16 +45,33 @@ class SystemAudioClient(AudioClient):
         import sounddevice as sd
 
         frames = int(duration * sample_rate)
-        recording = sd.rec(
-            frames,
+        # Blocks arrive as (frames, channels); write each straight into
+        # contiguous (channels, samples) rows instead of transposing at the end
+        out = np.empty((2, frames), dtype=np.float32)
+        if frames == 0:
+            return out
+        filled = 0
+        finished = threading.Event()
+
+        def _on_block(indata: np.ndarray, frame_count: int, time_info, status) -> None:
+            nonlocal filled
+            n = min(frame_count, frames - filled)
+            out[:, filled : filled + n] = indata[:n].T
+            filled += n
+            if filled >= frames:
+                raise sd.CallbackStop
+
+        with sd.InputStream(
             samplerate=sample_rate,
             channels=2,
             dtype="float32",
+            blocksize=1024,
             device=self._device,
-        )
-        sd.wait()
-        # sd.rec returns (samples, channels) — transpose to (channels, samples)
-        return recording.T
+            callback=_on_block,
+            finished_callback=finished.set,
+        ):
+            finished.wait()
+        return out[:, :filled]
 
     def close(self) -> None:
         pass
@@ -63,6 +93,9 @@ class TcpAudioClient(AudioClient):
         if self._server_socket is None:
             self._server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self._server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            # Set before listen() so accepted sockets inherit it and the TCP
+            # window can scale to multi-megabyte payloads
+            self._server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)
             self._server_socket.bind((self._host, self._port))
             self._server_socket.listen(1)
         return self._server_socket
@@ -71,23 +104,24 @@ class TcpAudioClient(AudioClient):
         srv = self._ensure_listening()
         conn, _ = srv.accept()
         try:
-            header = conn.recv(4)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            header = conn.recv(4, _MSG_WAITALL)
             if len(header) < 4:
                 raise IOError("Connection closed before header received")
             (num_bytes,) = struct.unpack(">I", header)
-            chunks: list[bytes] = []
-            remaining = num_bytes
-            while remaining > 0:
-                chunk = conn.recv(min(remaining, 65536))
-                if not chunk:
+            # Land the payload straight in its final buffer. With MSG_WAITALL
+            # this is normally a single call; the loop covers short reads.
+            buf = bytearray(num_bytes)
+            view = memoryview(buf)
+            received = 0
+            while received < num_bytes:
+                n = conn.recv_into(view[received:], num_bytes - received, _MSG_WAITALL)
+                if n == 0:
                     break
-                chunks.append(chunk)
-                remaining -= len(chunk)
-            raw = b"".join(chunks)
+                received += n
             # Interleaved stereo float32
-            samples = np.frombuffer(raw, dtype=np.float32)
-            samples = samples.reshape(-1, 2).T
-            return samples
+            samples = np.frombuffer(buf, dtype=np.float32, count=received // 4)
+            return _deinterleave(samples)
         finally:
             conn.close()
 
@@ -114,8 +148,7 @@ class StdinAudioClient(AudioClient):
         # Pad if we got less than expected
         if len(samples) < num_samples * 2:
             samples = np.pad(samples, (0, num_samples * 2 - len(samples)))
-        samples = samples[: num_samples * 2]
-        return samples.reshape(-1, 2).T
+        return _deinterleave(samples[: num_samples * 2])
 
     def close(self) -> None:
         pass
@@ -1,14 +1,35 @@
-import json
+import operator
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
 
-from rubin.analyzer import AudioAnalysis
+import numpy as np
+import orjson
+
+from rubin.analyzer import AudioAnalysis, FrequencyBandEnergy
 
 STYLES_DIR = Path(__file__).parent.parent.parent / "styles"
 USER_STYLES_DIR = Path.home() / ".rubin" / "styles"
 
-
-@dataclass
+# Frequency bands in FrequencyBandEnergy field order
+_BAND_NAMES = (
+    "sub_bass",
+    "bass",
+    "low_mid",
+    "mid",
+    "upper_mid",
+    "presence",
+    "brilliance",
+)
+# Reads every band off a FrequencyBandEnergy as a tuple in one call
+_band_getter = operator.attrgetter(*_BAND_NAMES)
+
+# Issue severity by how many half-widths a value lies outside its range:
+# up to 1, up to 2, beyond 2
+_SEVERITY = ("low", "medium", "high")
+
+
+@dataclass(frozen=True, slots=True)
 class Range:
     low: float
     high: float
@@ -18,14 +39,10 @@ class Range:
 
     def deviation(self, value: float) -> float:
         """How far outside the range the value is (0 if inside)."""
-        if value < self.low:
-            return self.low - value
-        if value > self.high:
-            return value - self.high
-        return 0.0
+        return max(0.0, self.low - value, value - self.high)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StyleProfile:
     name: str
     description: str
@@ -35,6 +52,29 @@ class StyleProfile:
     stereo_width: Range | None = None
     rms_mean: Range | None = None
 
+    # frequency_balance packed into arrays in _BAND_NAMES order, so evaluate()
+    # can score every band with a few vector ops. Built from the fields at
+    # construction; use dataclasses.replace() to derive a modified profile.
+    _band_low: np.ndarray = field(init=False, repr=False, compare=False)
+    _band_high: np.ndarray = field(init=False, repr=False, compare=False)
+    _band_span: np.ndarray = field(init=False, repr=False, compare=False)
+    _band_active: np.ndarray = field(init=False, repr=False, compare=False)
+    _has_band_targets: bool = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        ranges = [self.frequency_balance.get(band) for band in _BAND_NAMES]
+        low = np.array([r.low if r else 0.0 for r in ranges])
+        high = np.array([r.high if r else 0.0 for r in ranges])
+        active = np.array([r is not None for r in ranges])
+        object.__setattr__(self, "_band_active", active)
+        object.__setattr__(self, "_has_band_targets", bool(active.any()))
+        object.__setattr__(self, "_band_low", low)
+        object.__setattr__(self, "_band_high", high)
+        # Half-width of each range; empty ranges fall back to 1.0
+        object.__setattr__(
+            self, "_band_span", np.where(high > low, (high - low) / 2, 1.0)
+        )
+
     @classmethod
     def from_dict(cls, data: dict) -> "StyleProfile":
         freq_bal = {}
@@ -56,7 +96,7 @@ class StyleProfile:
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Issue:
     category: str  # e.g. "masking", "mud", "harshness", "thin_bass"
     severity: str  # "low", "medium", "high"
@@ -65,7 +105,7 @@ class Issue:
     suggestion: str
 
 
-@dataclass
+@dataclass(slots=True)
 class EvaluationResult:
     style: str
     cohesion_score: float  # 0-100
@@ -76,7 +116,7 @@ class EvaluationResult:
 TRACK_ROLES = ("bass", "lead", "pad", "percussion", "texture")
 
 
-@dataclass
+@dataclass(slots=True)
 class AuditionResult:
     style: str
     role: str  # detected or user-specified
@@ -86,39 +126,77 @@ class AuditionResult:
     issues: list[Issue]
 
 
+# Parsed profiles keyed by path, tagged with the file's mtime when read.
+# Profiles are frozen, so cached instances can be shared by callers.
+_style_cache: dict[Path, tuple[int, StyleProfile]] = {}
+
+
+def _read_style(path: Path) -> StyleProfile:
+    # Raises FileNotFoundError for a missing file; the stat doubles as the check
+    mtime = os.stat(path).st_mtime_ns
+    cached = _style_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        profile = StyleProfile.from_dict(orjson.loads(f.read()))
+    _style_cache[path] = (mtime, profile)
+    return profile
+
+
 def load_style(name: str) -> StyleProfile:
     # User styles take precedence over built-ins
-    user_path = USER_STYLES_DIR / f"{name}.json"
-    if user_path.exists():
-        with open(user_path) as f:
-            return StyleProfile.from_dict(json.load(f))
-    builtin_path = STYLES_DIR / f"{name}.json"
-    if builtin_path.exists():
-        with open(builtin_path) as f:
-            return StyleProfile.from_dict(json.load(f))
-    raise FileNotFoundError(f"Style profile not found: {name}")
+    try:
+        return _read_style(USER_STYLES_DIR / f"{name}.json")
+    except FileNotFoundError:
+        pass
+    try:
+        return _read_style(STYLES_DIR / f"{name}.json")
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Style profile not found: {name}") from None
 
 
 def list_styles() -> list[str]:
     names: set[str] = set()
-    if STYLES_DIR.exists():
-        names.update(p.stem for p in STYLES_DIR.glob("*.json"))
-    if USER_STYLES_DIR.exists():
-        names.update(p.stem for p in USER_STYLES_DIR.glob("*.json"))
+    for directory in (STYLES_DIR, USER_STYLES_DIR):
+        try:
+            with os.scandir(directory) as entries:
+                names.update(
+                    e.name[:-5]
+                    for e in entries
+                    if e.name.endswith(".json") and e.is_file()
+                )
+        except FileNotFoundError:
+            pass
     return sorted(names)
 
 
+def preload_styles() -> None:
+    """Parse every available style into the cache ahead of the first request.
+
+    Files that fail to load, whether unreadable, malformed JSON or the wrong
+    shape, are skipped here; load_style() reports the error if that style is
+    actually requested. One bad user file must not keep the server from
+    starting.
+    """
+    for name in list_styles():
+        try:
+            load_style(name)
+        except Exception:
+            pass
+
+
 def is_user_style(name: str) -> bool:
-    return (USER_STYLES_DIR / f"{name}.json").exists()
+    return os.path.lexists(USER_STYLES_DIR / f"{name}.json")
 
 
 def save_user_style(profile: StyleProfile) -> Path:
     USER_STYLES_DIR.mkdir(parents=True, exist_ok=True)
     path = USER_STYLES_DIR / f"{profile.name}.json"
     data = _profile_to_dict(profile)
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
-        f.write("\n")
+    path.write_bytes(
+        orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    )
+    _style_cache.pop(path, None)
     return path
 
 
@@ -127,6 +205,7 @@ def delete_user_style(name: str) -> None:
     if not path.exists():
         raise FileNotFoundError(f"User style not found: {name}")
     path.unlink()
+    _style_cache.pop(path, None)
 
 
 def _profile_to_dict(profile: StyleProfile) -> dict:
@@ -143,38 +222,57 @@ def _profile_to_dict(profile: StyleProfile) -> dict:
     return data
 
 
-def evaluate(analysis: AudioAnalysis, profile: StyleProfile) -> EvaluationResult:
-    issues: list[Issue] = []
-    band_scores: dict[str, float] = {}
-    score_components: list[float] = []
+def _score_range(
+    target: Range, value: float, degenerate_span: float = 1.0
+) -> tuple[float, float]:
+    """Score a value against a target range.
 
-    # --- Frequency band evaluation ---
-    bands = analysis.frequency_bands
-    band_map: dict[str, float] = {
-        "sub_bass": bands.sub_bass,
-        "bass": bands.bass,
-        "low_mid": bands.low_mid,
-        "mid": bands.mid,
-        "upper_mid": bands.upper_mid,
-        "presence": bands.presence,
-        "brilliance": bands.brilliance,
+    Returns (score, spans_out): the score is 100 inside the range and drops by
+    50 for every half-width the value lies outside it; spans_out is that
+    distance in half-widths. `degenerate_span` stands in for the half-width
+    when the range is empty.
+    """
+    span = (
+        (target.high - target.low) / 2 if target.high > target.low else degenerate_span
+    )
+    spans_out = target.deviation(value) / span
+    return max(0.0, 100.0 - spans_out * 50), spans_out
+
+
+def _evaluate_bands(
+    bands: FrequencyBandEnergy, profile: StyleProfile, issues: list[Issue]
+) -> tuple[dict[str, float], list[float]]:
+    """Per-band scores and score components; appends out-of-range issues."""
+    actuals = np.array(_band_getter(bands))
+    # Distance outside each target range, in half-widths
+    band_spans_out = (
+        np.maximum(
+            0.0,
+            np.maximum(profile._band_low - actuals, actuals - profile._band_high),
+        )
+        / profile._band_span
+    )
+    # Score: 100 when in range, drops proportionally outside
+    band_score_values = np.maximum(0.0, 100.0 - band_spans_out * 50)
+
+    active = profile._band_active
+    band_scores = {
+        band_name: round(score, 1) if is_active else 100.0
+        for band_name, score, is_active in zip(
+            _BAND_NAMES, band_score_values.tolist(), active.tolist()
+        )
     }
+    score_components = band_score_values[active].tolist()
 
-    for band_name, actual in band_map.items():
-        target = profile.frequency_balance.get(band_name)
-        if target is None:
-            band_scores[band_name] = 100.0
-            continue
-
-        dev = target.deviation(actual)
-        span = (target.high - target.low) / 2 if target.high > target.low else 1.0
-        # Score: 100 when in range, drops proportionally outside
-        score = max(0.0, 100.0 - (dev / span) * 50) if span > 0 else 100.0
-        band_scores[band_name] = round(score, 1)
-        score_components.append(score)
+    # Only bands outside their target range produce issues
+    for i in np.flatnonzero(active & (band_spans_out > 0)).tolist():
+        band_name = _BAND_NAMES[i]
+        actual = float(actuals[i])
+        spans_out = float(band_spans_out[i])
+        target = profile.frequency_balance[band_name]
+        severity = _SEVERITY[(spans_out > 1) + (spans_out > 2)]
 
         if actual > target.high:
-            severity = "high" if dev > span * 2 else "medium" if dev > span else "low"
             issue_cat = _categorize_excess(band_name)
             issues.append(
                 Issue(
@@ -189,11 +287,10 @@ def evaluate(analysis: AudioAnalysis, profile: StyleProfile) -> EvaluationResult
                     suggestion=_suggest_reduction(band_name),
                 )
             )
-        elif actual < target.low:
-            severity = "high" if dev > span * 2 else "medium" if dev > span else "low"
+        else:
             issues.append(
                 Issue(
-                    category="thin_" + band_name,
+                    category=_THIN_CATEGORIES[band_name],
                     severity=severity,
                     band=band_name,
                     message=(
@@ -205,17 +302,29 @@ def evaluate(analysis: AudioAnalysis, profile: StyleProfile) -> EvaluationResult
                 )
             )
 
+    return band_scores, score_components
+
+
+def evaluate(analysis: AudioAnalysis, profile: StyleProfile) -> EvaluationResult:
+    issues: list[Issue] = []
+
+    # --- Frequency band evaluation ---
+    if profile._has_band_targets:
+        band_scores, score_components = _evaluate_bands(
+            analysis.frequency_bands, profile, issues
+        )
+    else:
+        # No band targets: every band scores 100 and adds nothing to cohesion
+        band_scores = dict.fromkeys(_BAND_NAMES, 100.0)
+        score_components = []
+
     # --- Dynamic range ---
     if profile.dynamic_range_db:
         dr = analysis.loudness.dynamic_range_db
         target = profile.dynamic_range_db
-        if target.contains(dr):
-            score_components.append(100.0)
-        else:
-            dev = target.deviation(dr)
-            span = (target.high - target.low) / 2 if target.high > target.low else 1.0
-            s = max(0.0, 100.0 - (dev / span) * 50)
-            score_components.append(s)
+        score, _ = _score_range(target, dr)
+        score_components.append(score)
+        if not target.contains(dr):
             if dr < target.low:
                 issues.append(
                     Issue(
@@ -255,13 +364,9 @@ def evaluate(analysis: AudioAnalysis, profile: StyleProfile) -> EvaluationResult
     if profile.brightness:
         centroid = analysis.spectral.centroid_mean
         target = profile.brightness
-        if target.contains(centroid):
-            score_components.append(100.0)
-        else:
-            dev = target.deviation(centroid)
-            span = (target.high - target.low) / 2 if target.high > target.low else 1.0
-            s = max(0.0, 100.0 - (dev / span) * 50)
-            score_components.append(s)
+        score, _ = _score_range(target, centroid)
+        score_components.append(score)
+        if not target.contains(centroid):
             if centroid > target.high:
                 issues.append(
                     Issue(
@@ -298,13 +403,9 @@ def evaluate(analysis: AudioAnalysis, profile: StyleProfile) -> EvaluationResult
     if profile.stereo_width:
         width = analysis.stereo.width
         target = profile.stereo_width
-        if target.contains(width):
-            score_components.append(100.0)
-        else:
-            dev = target.deviation(width)
-            span = (target.high - target.low) / 2 if target.high > target.low else 0.1
-            s = max(0.0, 100.0 - (dev / span) * 50)
-            score_components.append(s)
+        score, _ = _score_range(target, width, degenerate_span=0.1)
+        score_components.append(score)
+        if not target.contains(width):
             if width > target.high:
                 issues.append(
                     Issue(
@@ -358,34 +459,28 @@ def audition(
     analysis: AudioAnalysis, profile: StyleProfile, role: str | None = None
 ) -> AuditionResult:
     """Analyze an isolated track in the context of a style profile."""
-    bands = analysis.frequency_bands
-    band_map: dict[str, float] = {
-        "sub_bass": bands.sub_bass,
-        "bass": bands.bass,
-        "low_mid": bands.low_mid,
-        "mid": bands.mid,
-        "upper_mid": bands.upper_mid,
-        "presence": bands.presence,
-        "brilliance": bands.brilliance,
-    }
+    energies = _band_getter(analysis.frequency_bands)
 
     # Normalize energy to 0-1 for frequency profile
-    total_energy = sum(band_map.values())
+    total_energy = sum(energies)
     if total_energy > 0:
-        freq_profile = {b: v / total_energy for b, v in band_map.items()}
+        proportions = [v / total_energy for v in energies]
     else:
-        freq_profile = {b: 0.0 for b in band_map}
+        proportions = [0.0] * len(energies)
+    freq_profile = dict(zip(_BAND_NAMES, proportions))
 
     # Dominant bands: top bands that together account for >= 70% of energy
-    sorted_bands = sorted(freq_profile.items(), key=lambda x: x[1], reverse=True)
-    dominant: list[str] = []
+    dominant_idx: list[int] = []
     cumulative = 0.0
-    for band_name, proportion in sorted_bands:
-        if proportion > 0:
-            dominant.append(band_name)
-            cumulative += proportion
-            if cumulative >= 0.7:
-                break
+    for i in sorted(range(len(proportions)), key=proportions.__getitem__, reverse=True):
+        proportion = proportions[i]
+        if proportion <= 0:
+            break
+        dominant_idx.append(i)
+        cumulative += proportion
+        if cumulative >= 0.7:
+            break
+    dominant = [_BAND_NAMES[i] for i in dominant_idx]
 
     # Classify role if not provided
     if role is None:
@@ -429,11 +524,12 @@ def audition(
                 )
 
     # Check if dominant bands fall within the style's target ranges
-    for band_name in dominant:
+    for i in dominant_idx:
+        band_name = _BAND_NAMES[i]
         target = profile.frequency_balance.get(band_name)
         if target is None:
             continue
-        actual = band_map[band_name]
+        actual = energies[i]
         if actual > target.high * 1.5:
             issues.append(
                 Issue(
@@ -499,92 +595,117 @@ def _classify_role(analysis: AudioAnalysis, freq_profile: dict[str, float]) -> s
     return "lead"  # default fallback
 
 
-def _role_band_affinity(role: str) -> dict[str, list[str]]:
+# Which bands each role should emphasize vs avoid
+_ROLE_BAND_AFFINITY: dict[str, dict[str, tuple[str, ...]]] = {
+    "bass": {
+        "primary": ("sub_bass", "bass"),
+        "avoid": ("upper_mid", "presence", "brilliance"),
+    },
+    "lead": {
+        "primary": ("mid", "upper_mid", "presence"),
+        "avoid": ("sub_bass",),
+    },
+    "pad": {
+        "primary": ("low_mid", "mid"),
+        "avoid": (),
+    },
+    "percussion": {
+        "primary": ("presence", "brilliance", "upper_mid"),
+        "avoid": ("sub_bass",),
+    },
+    "texture": {
+        "primary": ("mid", "presence", "brilliance"),
+        "avoid": (),
+    },
+}
+_DEFAULT_AFFINITY: dict[str, tuple[str, ...]] = {"primary": ("mid",), "avoid": ()}
+
+
+def _role_band_affinity(role: str) -> dict[str, tuple[str, ...]]:
     """Which bands a role should emphasize vs avoid."""
-    affinities = {
-        "bass": {
-            "primary": ["sub_bass", "bass"],
-            "avoid": ["upper_mid", "presence", "brilliance"],
-        },
-        "lead": {
-            "primary": ["mid", "upper_mid", "presence"],
-            "avoid": ["sub_bass"],
-        },
-        "pad": {
-            "primary": ["low_mid", "mid"],
-            "avoid": [],
-        },
-        "percussion": {
-            "primary": ["presence", "brilliance", "upper_mid"],
-            "avoid": ["sub_bass"],
-        },
-        "texture": {
-            "primary": ["mid", "presence", "brilliance"],
-            "avoid": [],
-        },
-    }
-    return affinities.get(role, {"primary": ["mid"], "avoid": []})
+    return _ROLE_BAND_AFFINITY.get(role, _DEFAULT_AFFINITY)
+
+
+_ROLE_CONFLICT_SUGGESTIONS = {
+    ("bass", "upper_mid"): (
+        "Apply a low-pass filter around 2-4 kHz "
+        "to keep the bass focused in the low end."
+    ),
+    ("bass", "presence"): (
+        "Roll off above 4 kHz — bass elements " "rarely need presence-range energy."
+    ),
+    ("bass", "brilliance"): (
+        "Filter out high frequencies above 6 kHz "
+        "to avoid interference with cymbals/hats."
+    ),
+    ("lead", "sub_bass"): (
+        "High-pass the lead around 80-100 Hz " "to avoid competing with the bass."
+    ),
+    ("percussion", "sub_bass"): (
+        "High-pass percussion above 60 Hz unless " "it's a kick drum."
+    ),
+}
 
 
 def _role_conflict_suggestion(role: str, band: str) -> str:
-    suggestions = {
-        ("bass", "upper_mid"): (
-            "Apply a low-pass filter around 2-4 kHz "
-            "to keep the bass focused in the low end."
-        ),
-        ("bass", "presence"): (
-            "Roll off above 4 kHz — bass elements " "rarely need presence-range energy."
-        ),
-        ("bass", "brilliance"): (
-            "Filter out high frequencies above 6 kHz "
-            "to avoid interference with cymbals/hats."
-        ),
-        ("lead", "sub_bass"): (
-            "High-pass the lead around 80-100 Hz " "to avoid competing with the bass."
-        ),
-        ("percussion", "sub_bass"): (
-            "High-pass percussion above 60 Hz unless " "it's a kick drum."
-        ),
-    }
-    return suggestions.get(
-        (role, band),
-        f"Consider reducing {band} energy on this {role} element.",
-    )
+    suggestion = _ROLE_CONFLICT_SUGGESTIONS.get((role, band))
+    if suggestion is None:
+        return f"Consider reducing {band} energy on this {role} element."
+    return suggestion
+
+
+_EXCESS_CATEGORIES = {
+    "sub_bass": "rumble",
+    "bass": "mud",
+    "low_mid": "mud",
+    "mid": "masking",
+    "upper_mid": "harshness",
+    "presence": "harshness",
+    "brilliance": "sibilance",
+}
+
+
+# Built once so every "thin_*" issue shares the same category string
+_THIN_CATEGORIES = {band: "thin_" + band for band in _BAND_NAMES}
 
 
 def _categorize_excess(band: str) -> str:
-    return {
-        "sub_bass": "rumble",
-        "bass": "mud",
-        "low_mid": "mud",
-        "mid": "masking",
-        "upper_mid": "harshness",
-        "presence": "harshness",
-        "brilliance": "sibilance",
-    }.get(band, "excess")
+    return _EXCESS_CATEGORIES.get(band, "excess")
+
+
+_REDUCTION_SUGGESTIONS = {
+    "sub_bass": "Apply a high-pass filter around 30-40 Hz to tame sub-bass rumble.",
+    "bass": "Cut 2-3 dB in the 100-250 Hz range to reduce muddiness.",
+    "low_mid": "Dip the 250-500 Hz region to clear boxy buildup.",
+    "mid": "Scoop 1-2 dB around 500-2000 Hz to reduce masking between elements.",
+    "upper_mid": "Attenuate 2-4 kHz to reduce harshness and listening fatigue.",
+    "presence": (
+        "Tame 4-6 kHz with a gentle cut " "to soften presence-range aggression."
+    ),
+    "brilliance": "Roll off above 10 kHz or de-ess vocals to control sibilance.",
+}
 
 
 def _suggest_reduction(band: str) -> str:
-    return {
-        "sub_bass": "Apply a high-pass filter around 30-40 Hz to tame sub-bass rumble.",
-        "bass": "Cut 2-3 dB in the 100-250 Hz range to reduce muddiness.",
-        "low_mid": "Dip the 250-500 Hz region to clear boxy buildup.",
-        "mid": "Scoop 1-2 dB around 500-2000 Hz to reduce masking between elements.",
-        "upper_mid": "Attenuate 2-4 kHz to reduce harshness and listening fatigue.",
-        "presence": (
-            "Tame 4-6 kHz with a gentle cut " "to soften presence-range aggression."
-        ),
-        "brilliance": "Roll off above 10 kHz or de-ess vocals to control sibilance.",
-    }.get(band, f"Reduce energy in the {band} band.")
+    suggestion = _REDUCTION_SUGGESTIONS.get(band)
+    if suggestion is None:
+        return f"Reduce energy in the {band} band."
+    return suggestion
+
+
+_BOOST_SUGGESTIONS = {
+    "sub_bass": "Boost sub-bass with a low shelf or saturator below 60 Hz.",
+    "bass": "Add warmth with a gentle boost around 80-150 Hz.",
+    "low_mid": "A small lift around 300-400 Hz can add body to thin mixes.",
+    "mid": "Boost midrange presence to help vocals and leads cut through.",
+    "upper_mid": "A lift around 2-4 kHz adds clarity and articulation.",
+    "presence": "Boost 4-6 kHz for more definition and attack.",
+    "brilliance": "Add a high shelf boost above 8 kHz for air and sparkle.",
+}
 
 
 def _suggest_boost(band: str) -> str:
-    return {
-        "sub_bass": "Boost sub-bass with a low shelf or saturator below 60 Hz.",
-        "bass": "Add warmth with a gentle boost around 80-150 Hz.",
-        "low_mid": "A small lift around 300-400 Hz can add body to thin mixes.",
-        "mid": "Boost midrange presence to help vocals and leads cut through.",
-        "upper_mid": "A lift around 2-4 kHz adds clarity and articulation.",
-        "presence": "Boost 4-6 kHz for more definition and attack.",
-        "brilliance": "Add a high shelf boost above 8 kHz for air and sparkle.",
-    }.get(band, f"Boost energy in the {band} band.")
+    suggestion = _BOOST_SUGGESTIONS.get(band)
+    if suggestion is None:
+        return f"Boost energy in the {band} band."
+    return suggestion
@@ -1,10 +1,16 @@
-import json
-from dataclasses import asdict
-
+import asyncio
+import operator
+import threading
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass, replace
+from typing import Literal, get_origin
+
+import numpy as np
+import orjson
 from injector import Injector, Module, provider, singleton
 from mcp.server.fastmcp import FastMCP
 
-from rubin.analyzer import analyze
+from rubin.analyzer import AnalyzeOptions, AudioAnalysis, analyze
 from rubin.client import AudioClient, SystemAudioClient
 from rubin.evaluator import (
     TRACK_ROLES,
@@ -20,6 +26,11 @@ from rubin.evaluator import (
 )
 
 
+def _dumps(obj: object, indent: bool = True) -> str:
+    # orjson serializes dataclasses natively, so results need no asdict() pass
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+
 class AudioModule(Module):
     @singleton
     @provider
@@ -27,8 +38,47 @@ class AudioModule(Module):
         return SystemAudioClient()
 
 
-# Snapshot storage: name -> (AudioAnalysis dict, style evaluated against)
-_snapshots: dict[str, dict] = {}
+# evaluate() and audition() never read timbre, so skip computing it
+_EVAL_OPTIONS = AnalyzeOptions(mfcc=False, chroma=False)
+
+
+def _compare_plan(
+    cls: type, prefix: tuple[str, ...] = ()
+) -> list[tuple[tuple[str, ...], Literal["scalar", "list"]]]:
+    """Flatten a dataclass schema into (path, kind) for each leaf field."""
+    plan: list[tuple[tuple[str, ...], Literal["scalar", "list"]]] = []
+    for f in fields(cls):
+        path = prefix + (f.name,)
+        if is_dataclass(f.type):
+            plan.extend(_compare_plan(f.type, path))
+        else:
+            plan.append((path, "list" if get_origin(f.type) is list else "scalar"))
+    return plan
+
+
+# Leaf fields of AudioAnalysis, in field order
+_COMPARE_PLAN = _compare_plan(AudioAnalysis)
+
+
+# Reads every leaf of an AudioAnalysis in one call, in _COMPARE_PLAN order
+_leaf_getter = operator.attrgetter(*(".".join(path) for path, _ in _COMPARE_PLAN))
+
+
+def _snapshot_leaves(analysis: AudioAnalysis) -> tuple:
+    """Leaf values in _COMPARE_PLAN order, with list leaves as float64 arrays."""
+    return tuple(
+        np.asarray(value, dtype=np.float64) if kind == "list" else value
+        for (_, kind), value in zip(_COMPARE_PLAN, _leaf_getter(analysis))
+    )
+
+
+# Sort order for suggestions, most severe first
+_SEVERITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+# Snapshot storage: name -> leaves aligned with _COMPARE_PLAN, least recently
+# used first
+_snapshots: OrderedDict[str, tuple] = OrderedDict()
+_SNAPSHOT_LIMIT = 64
 
 
 def create_server(injector: Injector | None = None) -> FastMCP:
@@ -40,6 +90,25 @@ def create_server(injector: Injector | None = None) -> FastMCP:
     def _client() -> AudioClient:
         return injector.get(AudioClient)
 
+    # One capture at a time on the shared client; analysis can overlap
+    capture_lock = threading.Lock()
+
+    def _capture_and_analyze(
+        duration: float, sample_rate: int, opts: AnalyzeOptions | None
+    ) -> AudioAnalysis:
+        with capture_lock:
+            audio = _client().capture(duration, sample_rate)
+        return analyze(audio, sample_rate, opts)
+
+    async def _analysis(
+        duration: float, sample_rate: int, opts: AnalyzeOptions | None = None
+    ) -> AudioAnalysis:
+        # Capture blocks for the whole duration and analysis is CPU-bound, so
+        # both run on a worker thread to keep the event loop responsive
+        return await asyncio.to_thread(
+            _capture_and_analyze, duration, sample_rate, opts
+        )
+
     # ------------------------------------------------------------------
     # Tool: evaluate_mix
     # ------------------------------------------------------------------
@@ -57,10 +126,9 @@ def create_server(injector: Injector | None = None) -> FastMCP:
         Returns JSON with cohesion_score (0-100), issues, and per-band scores.
         """
         profile = load_style(style)
-        audio = _client().capture(duration, sample_rate)
-        analysis = analyze(audio, sample_rate)
+        analysis = await _analysis(duration, sample_rate, _EVAL_OPTIONS)
         result = evaluate(analysis, profile)
-        return json.dumps(asdict(result), indent=2)
+        return _dumps(result)
 
     # ------------------------------------------------------------------
     # Tool: capture_snapshot
@@ -76,13 +144,17 @@ def create_server(injector: Injector | None = None) -> FastMCP:
             duration: Seconds of audio to capture.
             sample_rate: Sample rate for capture.
 
+        Once the snapshot limit is reached, the least recently used snapshot
+        is evicted.
+
         Returns the full analysis as JSON.
         """
-        audio = _client().capture(duration, sample_rate)
-        analysis = analyze(audio, sample_rate)
-        analysis_dict = asdict(analysis)
-        _snapshots[name] = analysis_dict
-        return json.dumps(analysis_dict, indent=2)
+        analysis = await _analysis(duration, sample_rate)
+        _snapshots[name] = _snapshot_leaves(analysis)
+        _snapshots.move_to_end(name)
+        if len(_snapshots) > _SNAPSHOT_LIMIT:
+            _snapshots.popitem(last=False)
+        return _dumps(analysis)
 
     # ------------------------------------------------------------------
     # Tool: compare_snapshots
@@ -98,39 +170,29 @@ def create_server(injector: Injector | None = None) -> FastMCP:
         Returns JSON with per-metric deltas between the two snapshots.
         """
         if name_a not in _snapshots:
-            return json.dumps({"error": f"Snapshot '{name_a}' not found"})
+            return _dumps({"error": f"Snapshot '{name_a}' not found"}, indent=False)
         if name_b not in _snapshots:
-            return json.dumps({"error": f"Snapshot '{name_b}' not found"})
+            return _dumps({"error": f"Snapshot '{name_b}' not found"}, indent=False)
 
+        _snapshots.move_to_end(name_a)
+        _snapshots.move_to_end(name_b)
         a = _snapshots[name_a]
         b = _snapshots[name_b]
 
-        def _delta(path: list[str], da: dict, db: dict) -> dict:
-            result = {}
-            for key in da:
-                va, vb = da[key], db.get(key)
-                if isinstance(va, dict) and isinstance(vb, dict):
-                    result[key] = _delta(path + [key], va, vb)
-                elif isinstance(va, list) and isinstance(vb, list):
-                    result[key] = {
-                        "a": va,
-                        "b": vb,
-                        "delta": [
-                            round(float(bv) - float(av), 6) for av, bv in zip(va, vb)
-                        ],
-                    }
-                elif isinstance(va, (int, float)) and isinstance(vb, (int, float)):
-                    result[key] = {
-                        "a": va,
-                        "b": vb,
-                        "delta": round(float(vb) - float(va), 6),
-                    }
-                else:
-                    result[key] = {"a": va, "b": vb}
-            return result
-
-        comparison = _delta([], a, b)
-        return json.dumps(comparison, indent=2)
+        comparison: dict = {}
+        for (path, kind), va, vb in zip(_COMPARE_PLAN, a, b):
+            if kind == "list":
+                n = min(va.size, vb.size)
+                delta = [round(d, 6) for d in np.subtract(vb[:n], va[:n]).tolist()]
+                va, vb = va.tolist(), vb.tolist()
+            else:
+                delta = round(float(vb) - float(va), 6)
+            parent = comparison
+            for key in path[:-1]:
+                parent = parent.setdefault(key, {})
+            parent[path[-1]] = {"a": va, "b": vb, "delta": delta}
+
+        return _dumps(comparison)
 
     # ------------------------------------------------------------------
     # Tool: get_spectral_data
@@ -146,9 +208,8 @@ def create_server(injector: Injector | None = None) -> FastMCP:
         Returns the full analysis as JSON (spectral, timbral,
         loudness, frequency bands, stereo).
         """
-        audio = _client().capture(duration, sample_rate)
-        analysis = analyze(audio, sample_rate)
-        return json.dumps(asdict(analysis), indent=2)
+        analysis = await _analysis(duration, sample_rate)
+        return _dumps(analysis)
 
     # ------------------------------------------------------------------
     # Tool: suggest_adjustments
@@ -168,13 +229,11 @@ def create_server(injector: Injector | None = None) -> FastMCP:
         Returns JSON list of suggestions sorted by severity.
         """
         profile = load_style(style)
-        audio = _client().capture(duration, sample_rate)
-        analysis = analyze(audio, sample_rate)
+        analysis = await _analysis(duration, sample_rate, _EVAL_OPTIONS)
         result = evaluate(analysis, profile)
 
-        severity_order = {"high": 0, "medium": 1, "low": 2}
         sorted_issues = sorted(
-            result.issues, key=lambda i: severity_order.get(i.severity, 3)
+            result.issues, key=lambda i: _SEVERITY_RANK.get(i.severity, 3)
         )
         suggestions = [
             {
@@ -187,13 +246,12 @@ def create_server(injector: Injector | None = None) -> FastMCP:
             for issue in sorted_issues
         ]
 
-        return json.dumps(
+        return _dumps(
             {
                 "style": style,
                 "cohesion_score": result.cohesion_score,
                 "suggestions": suggestions,
-            },
-            indent=2,
+            }
         )
 
     # ------------------------------------------------------------------
@@ -225,19 +283,19 @@ def create_server(injector: Injector | None = None) -> FastMCP:
         frequency_profile, and issues.
         """
         if role is not None and role not in TRACK_ROLES:
-            return json.dumps(
+            return _dumps(
                 {
                     "error": (
                         f"Invalid role '{role}'. "
                         f"Must be one of: {', '.join(TRACK_ROLES)}"
                     )
-                }
+                },
+                indent=False,
             )
         profile = load_style(style)
-        audio = _client().capture(duration, sample_rate)
-        analysis = analyze(audio, sample_rate)
+        analysis = await _analysis(duration, sample_rate, _EVAL_OPTIONS)
         result = audition(analysis, profile, role)
-        return json.dumps(asdict(result), indent=2)
+        return _dumps(result)
 
     # ------------------------------------------------------------------
     # Tool: list_style_profiles
@@ -259,7 +317,7 @@ def create_server(injector: Injector | None = None) -> FastMCP:
                     "source": "user" if is_user_style(name) else "built-in",
                 }
             )
-        return json.dumps(profiles, indent=2)
+        return _dumps(profiles)
 
     # ------------------------------------------------------------------
     # Tool: create_style
@@ -308,7 +366,9 @@ def create_server(injector: Injector | None = None) -> FastMCP:
             rms_mean=_to_range(rms_mean),
         )
         path = save_user_style(profile)
-        return json.dumps({"status": "created", "path": str(path), "profile": name})
+        return _dumps(
+            {"status": "created", "path": str(path), "profile": name}, indent=False
+        )
 
     # ------------------------------------------------------------------
     # Tool: update_style
@@ -342,26 +402,29 @@ def create_server(injector: Injector | None = None) -> FastMCP:
         try:
             profile = load_style(name)
         except FileNotFoundError:
-            return json.dumps({"error": f"Style '{name}' not found"})
+            return _dumps({"error": f"Style '{name}' not found"}, indent=False)
 
+        changes: dict = {}
         if description is not None:
-            profile.description = description
+            changes["description"] = description
         if frequency_balance:
-            for band, r in frequency_balance.items():
-                profile.frequency_balance[band] = Range(r["low"], r["high"])
+            changes["frequency_balance"] = {
+                **profile.frequency_balance,
+                **{b: Range(r["low"], r["high"]) for b, r in frequency_balance.items()},
+            }
         if dynamic_range_db:
-            profile.dynamic_range_db = Range(
+            changes["dynamic_range_db"] = Range(
                 dynamic_range_db["low"], dynamic_range_db["high"]
             )
         if brightness:
-            profile.brightness = Range(brightness["low"], brightness["high"])
+            changes["brightness"] = Range(brightness["low"], brightness["high"])
         if stereo_width:
-            profile.stereo_width = Range(stereo_width["low"], stereo_width["high"])
+            changes["stereo_width"] = Range(stereo_width["low"], stereo_width["high"])
         if rms_mean:
-            profile.rms_mean = Range(rms_mean["low"], rms_mean["high"])
+            changes["rms_mean"] = Range(rms_mean["low"], rms_mean["high"])
 
-        save_user_style(profile)
-        return json.dumps({"status": "updated", "profile": name})
+        save_user_style(replace(profile, **changes))
+        return _dumps({"status": "updated", "profile": name}, indent=False)
 
     # ------------------------------------------------------------------
     # Tool: delete_style
@@ -377,11 +440,12 @@ def create_server(injector: Injector | None = None) -> FastMCP:
         be removed.
         """
         if not is_user_style(name):
-            return json.dumps(
-                {"error": f"'{name}' is a built-in style and cannot be deleted"}
+            return _dumps(
+                {"error": f"'{name}' is a built-in style and cannot be deleted"},
+                indent=False,
             )
         delete_user_style(name)
-        return json.dumps({"status": "deleted", "profile": name})
+        return _dumps({"status": "deleted", "profile": name}, indent=False)
 
     # ------------------------------------------------------------------
     # Tool: list_snapshots
@@ -392,7 +456,7 @@ def create_server(injector: Injector | None = None) -> FastMCP:
 
         Returns JSON list of snapshot names.
         """
-        return json.dumps(list(sorted(_snapshots.keys())))
+        return _dumps(list(sorted(_snapshots.keys())), indent=False)
 
     return server
 
@@ -0,0 +1,27 @@
+"""Synthetic audio shared across the test suite."""
+
+from functools import lru_cache
+
+import numpy as np
+
+
+def sine_phase(freq: float, n: int, sr: int) -> np.ndarray:
+    """Phase of an n-sample sine at `freq` Hz, as a fresh float32 array."""
+    return np.arange(n, dtype=np.float32) * np.float32(2 * np.pi * freq / sr)
+
+
+@lru_cache(maxsize=32)
+def _mono_sine(freq: float, duration: float, sr: int, amplitude: float) -> np.ndarray:
+    sine = sine_phase(freq, int(duration * sr), sr)
+    np.sin(sine, out=sine)
+    sine *= np.float32(amplitude)
+    sine.setflags(write=False)
+    return sine
+
+
+def make_sine(
+    freq: float, duration: float = 1.0, sr: int = 44100, amplitude: float = 0.5
+) -> np.ndarray:
+    """Read-only stereo sine; both channels view one cached mono buffer."""
+    sine = _mono_sine(freq, duration, sr, amplitude)
+    return np.broadcast_to(sine, (2, sine.size))
@@ -1,9 +1,33 @@
+from unittest.mock import patch
+
 import numpy as np
+import orjson
 import pytest
 from injector import Injector, Module, provider, singleton
 
+from rubin.analyzer import AudioAnalysis, analyze
 from rubin.client import AudioClient
 from rubin.server import create_server
+from tests._audio_fixtures import make_sine
+
+# Modules whose tests share the session analysis fixtures below. Under
+# `pytest -n auto --dist loadgroup` they run on one worker, which builds
+# each cached sine and analysis once.
+_ANALYZE_GROUP_MODULES = {"test_analyzer.py", "test_evaluator.py"}
+
+
+def pytest_configure(config):
+    # Registered here too so the mark is known when xdist isn't installed
+    config.addinivalue_line("markers", "xdist_group(name): run on one xdist worker")
+    config.addinivalue_line(
+        "markers", "schema_only: tool test that skips the analyzer (see _stub_analyze)"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    for item in items:
+        if item.path.name in _ANALYZE_GROUP_MODULES:
+            item.add_marker(pytest.mark.xdist_group("analyze"))
 
 
 class FakeAudioClient(AudioClient):
@@ -13,17 +37,15 @@ class FakeAudioClient(AudioClient):
         self._audio: np.ndarray | None = None
         self.captures: list[tuple[float, int]] = []
 
-    def set_audio(self, audio: np.ndarray) -> None:
+    def set_audio(self, audio: np.ndarray | None) -> None:
         self._audio = audio
 
     def capture(self, duration: float, sample_rate: int = 44100) -> np.ndarray:
         self.captures.append((duration, sample_rate))
         if self._audio is not None:
             return self._audio
-        # Default: generate a simple sine wave (stereo)
-        t = np.linspace(0, duration, int(duration * sample_rate), endpoint=False)
-        sine = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
-        return np.stack([sine, sine])
+        # Default: a simple sine wave (stereo)
+        return make_sine(440, duration, sample_rate, amplitude=0.3)
 
     def close(self) -> None:
         pass
@@ -39,12 +61,64 @@ class FakeAudioModule(Module):
         return self._fake_client
 
 
-@pytest.fixture
+# The fake client and server are built once per module; _reset_fake_client
+# clears the client's state before every test that talks to the server
+@pytest.fixture(scope="module")
 def fake_client():
     return FakeAudioClient()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mcp_server(fake_client):
     injector = Injector([FakeAudioModule(fake_client)])
     return create_server(injector)
+
+
+@pytest.fixture(autouse=True)
+def _reset_fake_client(request):
+    if "mcp_server" in request.fixturenames:
+        client = request.getfixturevalue("fake_client")
+        client.captures.clear()
+        client.set_audio(None)
+
+
+@pytest.fixture(autouse=True)
+def _stub_analyze(request):
+    """Serve the cached 440 Hz analysis to tools in `schema_only` tests.
+
+    Those tests only check the shape of a tool's result, so they skip the
+    real analyzer; the fake client still records each capture.
+    """
+    if request.node.get_closest_marker("schema_only") is None:
+        yield
+        return
+    analysis = request.getfixturevalue("analysis_440")
+    with patch("rubin.server.analyze", return_value=analysis):
+        yield
+
+
+@pytest.fixture
+def call_tool_json(mcp_server):
+    """Call a tool on the test server and return its decoded JSON result."""
+
+    async def call(name: str, arguments: dict):
+        content, _ = await mcp_server.call_tool(name, arguments)
+        return orjson.loads(content[0].text)
+
+    return call
+
+
+# Analyses are frozen, so one per test sine can be shared by the whole session
+@pytest.fixture(scope="session")
+def analysis_440() -> AudioAnalysis:
+    return analyze(make_sine(440), 44100)
+
+
+@pytest.fixture(scope="session")
+def analysis_80() -> AudioAnalysis:
+    return analyze(make_sine(80), 44100)
+
+
+@pytest.fixture(scope="session")
+def analysis_2000() -> AudioAnalysis:
+    return analyze(make_sine(2000), 44100)
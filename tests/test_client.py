@@ -0,0 +1,109 @@
+import socket
+import struct
+import threading
+import types
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from rubin.client import SystemAudioClient, TcpAudioClient, _deinterleave
+
+_PCM = np.random.default_rng(0).standard_normal(2 * 50_000).astype(np.float32)
+
+
+def test_deinterleave_splits_channels():
+    out = _deinterleave(_PCM[:7])  # odd count: the trailing sample is dropped
+    assert out.shape == (2, 3)
+    assert out.flags.c_contiguous
+    np.testing.assert_array_equal(out[0], _PCM[0:6:2])
+    np.testing.assert_array_equal(out[1], _PCM[1:6:2])
+
+
+@pytest.fixture
+def tcp_client():
+    client = TcpAudioClient("127.0.0.1", 0)
+    client._ensure_listening()
+    yield client
+    client.close()
+
+
+def _send(client: TcpAudioClient, payload: bytes, declared: int) -> threading.Thread:
+    """Send a header declaring `declared` bytes, then `payload` in small chunks."""
+    port = client._server_socket.getsockname()[1]
+
+    def run():
+        with socket.create_connection(("127.0.0.1", port)) as sock:
+            sock.sendall(struct.pack(">I", declared))
+            for i in range(0, len(payload), 7777):
+                sock.sendall(payload[i : i + 7777])
+
+    sender = threading.Thread(target=run)
+    sender.start()
+    return sender
+
+
+@pytest.mark.parametrize(
+    "payload, declared",
+    [
+        (_PCM.tobytes(), _PCM.nbytes),  # full payload, split across reads
+        (_PCM[:1000].tobytes(), _PCM.nbytes),  # sender closes early
+        (_PCM[:1001].tobytes() + b"\x00\x00", 1001 * 4 + 2),  # odd byte count
+    ],
+    ids=["full", "short", "odd"],
+)
+def test_tcp_capture(tcp_client, payload, declared):
+    sender = _send(tcp_client, payload, declared)
+    out = tcp_client.capture(1.0)
+    sender.join()
+
+    frames = len(payload) // 8
+    assert out.shape == (2, frames)
+    assert out.flags.c_contiguous
+    np.testing.assert_array_equal(out[0], _PCM[0 : 2 * frames : 2])
+    np.testing.assert_array_equal(out[1], _PCM[1 : 2 * frames : 2])
+
+
+class _CallbackStop(Exception):
+    pass
+
+
+class _FakeInputStream:
+    """Feeds numbered (frames, channels) blocks to the callback on a thread."""
+
+    def __init__(self, callback, finished_callback, blocksize, **kwargs):
+        self._callback = callback
+        self._finished = finished_callback
+        self._blocksize = blocksize
+
+    def _run(self):
+        start = 0
+        try:
+            while True:
+                block = np.arange(start, start + 2 * self._blocksize, dtype=np.float32)
+                start += block.size
+                self._callback(block.reshape(-1, 2), self._blocksize, None, None)
+        except _CallbackStop:
+            pass
+        self._finished()
+
+    def __enter__(self):
+        threading.Thread(target=self._run).start()
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def test_system_capture_streams_into_contiguous_buffer():
+    fake_sd = types.SimpleNamespace(
+        InputStream=_FakeInputStream, CallbackStop=_CallbackStop
+    )
+    with patch.dict("sys.modules", {"sounddevice": fake_sd}):
+        out = SystemAudioClient().capture(0.1, 44100)
+
+    # 4410 frames is not a whole number of 1024-frame blocks
+    assert out.shape == (2, 4410)
+    assert out.flags.c_contiguous
+    np.testing.assert_array_equal(out[0], np.arange(0, 8820, 2))
+    np.testing.assert_array_equal(out[1], np.arange(1, 8820, 2))
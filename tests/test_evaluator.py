@@ -1,9 +1,10 @@
 import json
+import math
+import os
 from unittest.mock import patch
 
-import numpy as np
+import pytest
 
-from rubin.analyzer import analyze
 from rubin.evaluator import (
     Range,
     StyleProfile,
@@ -13,19 +14,12 @@ from rubin.evaluator import (
     is_user_style,
     list_styles,
     load_style,
+    preload_styles,
     save_user_style,
 )
 
-
-def _make_sine(freq: float, duration: float = 1.0, sr: int = 44100) -> np.ndarray:
-    t = np.linspace(0, duration, int(duration * sr), endpoint=False)
-    sine = (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
-    return np.stack([sine, sine])
-
-
-def test_list_styles():
-    styles = list_styles()
-    expected = [
+_EXPECTED_STYLES = frozenset(
+    {
         "ambient",
         "downtempo",
         "drum-and-bass",
@@ -42,9 +36,18 @@ def test_list_styles():
         "synthpop",
         "techno",
         "vaporwave",
-    ]
-    for name in expected:
-        assert name in styles
+    }
+)
+
+
+@pytest.fixture(scope="module")
+def all_styles() -> set[str]:
+    return set(list_styles())
+
+
+def test_list_styles(all_styles):
+    missing = _EXPECTED_STYLES.difference(all_styles)
+    assert not missing, missing
 
 
 def test_load_style():
@@ -54,11 +57,9 @@ def test_load_style():
     assert profile.dynamic_range_db is not None
 
 
-def test_evaluate_returns_result():
-    audio = _make_sine(440)
-    analysis = analyze(audio, 44100)
+def test_evaluate_returns_result(analysis_440):
     profile = load_style("ambient")
-    result = evaluate(analysis, profile)
+    result = evaluate(analysis_440, profile)
 
     assert result.style == "ambient"
     assert 0 <= result.cohesion_score <= 100
@@ -66,7 +67,17 @@ def test_evaluate_returns_result():
     assert isinstance(result.band_scores, dict)
 
 
-def test_evaluate_perfect_score_when_in_range():
+def test_evaluate_without_band_targets(analysis_440):
+    """Bands without targets score 100 and raise no issues."""
+    profile = StyleProfile(name="loose", description="No band targets")
+    result = evaluate(analysis_440, profile)
+
+    assert set(result.band_scores.values()) == {100.0}
+    assert result.issues == []
+    assert result.cohesion_score == 100.0
+
+
+def test_evaluate_perfect_score_when_in_range(analysis_440):
     """A profile with very wide ranges should give a high score."""
     profile = StyleProfile(
         name="test",
@@ -84,14 +95,12 @@ def test_evaluate_perfect_score_when_in_range():
         brightness=Range(0, 20000),
         stereo_width=Range(0, 1),
     )
-    audio = _make_sine(440)
-    analysis = analyze(audio, 44100)
-    result = evaluate(analysis, profile)
+    result = evaluate(analysis_440, profile)
     assert result.cohesion_score == 100.0
     assert len(result.issues) == 0
 
 
-def test_evaluate_flags_issues():
+def test_evaluate_flags_issues(analysis_440):
     """A very tight profile should flag issues for a broadband signal."""
     profile = StyleProfile(
         name="tight",
@@ -100,9 +109,7 @@ def test_evaluate_flags_issues():
             "mid": Range(999.0, 999.1),
         },
     )
-    audio = _make_sine(440)
-    analysis = analyze(audio, 44100)
-    result = evaluate(analysis, profile)
+    result = evaluate(analysis_440, profile)
     # Should have at least one issue since the sine won't match such a tight range
     assert len(result.issues) > 0 or result.band_scores.get("mid", 100) < 100
 
@@ -124,6 +131,37 @@ def test_save_and_load_user_style(tmp_path):
         assert loaded.dynamic_range_db is not None
 
 
+def test_load_style_picks_up_external_edits(tmp_path):
+    """A style file changed on disk is re-read instead of served from cache."""
+    path = tmp_path / "edited.json"
+    path.write_text(json.dumps({"name": "edited", "description": "v1"}))
+    with patch("rubin.evaluator.USER_STYLES_DIR", tmp_path):
+        first = load_style("edited")
+        assert load_style("edited") is first
+        path.write_text(json.dumps({"name": "edited", "description": "v2"}))
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert load_style("edited").description == "v2"
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "{not json",
+        "[]",
+        '"str"',
+        '{"name": "x", "description": "d", "brightness": 5}',
+        '{"name": "x", "description": "d", "frequency_balance": {"bass": [0, 1]}}',
+    ],
+    ids=["invalid-json", "list", "string", "scalar-range", "list-range"],
+)
+def test_preload_styles_skips_broken_files(tmp_path, content):
+    (tmp_path / "broken.json").write_text(content)
+    with patch("rubin.evaluator.USER_STYLES_DIR", tmp_path):
+        preload_styles()
+        assert load_style("ambient").name == "ambient"
+
+
 def test_user_style_overrides_builtin(tmp_path):
     """A user style with the same name as a built-in takes precedence."""
     profile = StyleProfile(
@@ -190,22 +228,17 @@ def test_profile_roundtrip(tmp_path):
     with patch("rubin.evaluator.USER_STYLES_DIR", tmp_path):
         save_user_style(profile)
         loaded = load_style("roundtrip")
-        assert loaded.name == profile.name
-        assert loaded.brightness.low == 2000
-        assert loaded.brightness.high == 5000
-        assert loaded.rms_mean.low == 0.05
+        assert loaded == profile
         path = tmp_path / "roundtrip.json"
         data = json.loads(path.read_text())
         assert data["name"] == "roundtrip"
         assert "frequency_balance" in data
 
 
-def test_audition_low_freq_classifies_as_bass():
+def test_audition_low_freq_classifies_as_bass(analysis_80):
     """A low-frequency sine should be classified as a bass element."""
-    audio = _make_sine(80)
-    analysis = analyze(audio, 44100)
     profile = load_style("techno")
-    result = audition(analysis, profile)
+    result = audition(analysis_80, profile)
     assert result.role == "bass"
     assert result.style == "techno"
     assert 0 <= result.fit_score <= 100
@@ -213,29 +246,24 @@ def test_audition_low_freq_classifies_as_bass():
     assert len(result.frequency_profile) == 7
 
 
-def test_audition_mid_freq_classifies_as_lead():
+def test_audition_mid_freq_classifies_as_lead(analysis_2000):
     """A mid-frequency sine should be classified as a lead element."""
-    audio = _make_sine(2000)
-    analysis = analyze(audio, 44100)
     profile = load_style("synthpop")
-    result = audition(analysis, profile)
+    result = audition(analysis_2000, profile)
     assert result.role == "lead"
 
 
-def test_audition_explicit_role_override():
+def test_audition_explicit_role_override(analysis_80):
     """User-specified role should override auto-detection."""
-    audio = _make_sine(80)
-    analysis = analyze(audio, 44100)
     profile = load_style("ambient")
-    result = audition(analysis, profile, role="pad")
+    result = audition(analysis_80, profile, role="pad")
     assert result.role == "pad"
 
 
-def test_audition_frequency_profile_sums_to_one():
+def test_audition_frequency_profile_sums_to_one(analysis_440):
     """Frequency profile values should sum to approximately 1."""
-    audio = _make_sine(440)
-    analysis = analyze(audio, 44100)
     profile = load_style("ambient")
-    result = audition(analysis, profile)
-    total = sum(result.frequency_profile.values())
-    assert abs(total - 1.0) < 0.01
+    result = audition(analysis_440, profile)
+    total = math.fsum(result.frequency_profile.values())
+    # Each of the 7 values is rounded to 4 decimals: at most 7 * 5e-5 off
+    assert abs(total - 1.0) <= 3.5e-4
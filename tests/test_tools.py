@@ -3,14 +3,13 @@ from unittest.mock import patch
 
 import pytest
 
+from rubin.server import _snapshot_leaves
+
 
 @pytest.mark.anyio
-async def test_list_style_profiles(mcp_server):
-    content, _ = await mcp_server.call_tool("list_style_profiles", {})
-    result = json.loads(content[0].text)
-    names = [p["name"] for p in result]
-    assert "ambient" in names
-    assert "synthpop" in names
+async def test_list_style_profiles(call_tool_json):
+    result = await call_tool_json("list_style_profiles", {})
+    assert {p["name"] for p in result}.issuperset({"ambient", "synthpop"})
     # Verify structure
     entry = result[0]
     assert "name" in entry
@@ -20,11 +19,9 @@ async def test_list_style_profiles(mcp_server):
 
 
 @pytest.mark.anyio
-async def test_evaluate_mix(fake_client, mcp_server):
-    content, _ = await mcp_server.call_tool(
-        "evaluate_mix", {"style": "ambient", "duration": 1.0}
-    )
-    result = json.loads(content[0].text)
+@pytest.mark.schema_only
+async def test_evaluate_mix(fake_client, call_tool_json):
+    result = await call_tool_json("evaluate_mix", {"style": "ambient", "duration": 1.0})
     assert "cohesion_score" in result
     assert "issues" in result
     assert "band_scores" in result
@@ -33,11 +30,11 @@ async def test_evaluate_mix(fake_client, mcp_server):
 
 
 @pytest.mark.anyio
-async def test_get_spectral_data(fake_client, mcp_server):
-    content, _ = await mcp_server.call_tool(
+@pytest.mark.schema_only
+async def test_get_spectral_data(fake_client, call_tool_json):
+    result = await call_tool_json(
         "get_spectral_data", {"duration": 2.0, "sample_rate": 22050}
     )
-    result = json.loads(content[0].text)
     assert "spectral" in result
     assert "timbre" in result
     assert "loudness" in result
@@ -46,41 +43,66 @@ async def test_get_spectral_data(fake_client, mcp_server):
     assert fake_client.captures == [(2.0, 22050)]
 
 
+@pytest.fixture
+def stashed_snapshots(analysis_440):
+    """Two snapshots of the same analysis, stored without capturing."""
+    leaves = _snapshot_leaves(analysis_440)
+    with patch.dict(
+        "rubin.server._snapshots", {"snap_a": leaves, "snap_b": leaves}, clear=True
+    ):
+        yield
+
+
 @pytest.mark.anyio
-async def test_capture_and_compare_snapshots(fake_client, mcp_server):
-    # Capture two snapshots
-    await mcp_server.call_tool("capture_snapshot", {"name": "snap_a", "duration": 1.0})
-    await mcp_server.call_tool("capture_snapshot", {"name": "snap_b", "duration": 1.0})
+async def test_capture_snapshot(fake_client, call_tool_json):
+    with patch.dict("rubin.server._snapshots", clear=True):
+        assert "spectral" in await call_tool_json(
+            "capture_snapshot", {"name": "snap", "duration": 1.0}
+        )
+        assert await call_tool_json("list_snapshots", {}) == ["snap"]
 
-    # List them
-    content, _ = await mcp_server.call_tool("list_snapshots", {})
-    names = json.loads(content[0].text)
+
+@pytest.mark.anyio
+async def test_compare_snapshots(call_tool_json, stashed_snapshots):
+    names = await call_tool_json("list_snapshots", {})
     assert "snap_a" in names
     assert "snap_b" in names
 
-    # Compare
-    content, _ = await mcp_server.call_tool(
+    result = await call_tool_json(
         "compare_snapshots", {"name_a": "snap_a", "name_b": "snap_b"}
     )
-    result = json.loads(content[0].text)
     assert "spectral" in result
+    assert result["spectral"]["centroid_mean"]["delta"] == 0
+    assert set(result["timbre"]["mfcc_means"]["delta"]) == {0}
+
+
+@pytest.mark.anyio
+async def test_snapshots_evict_least_recently_used(mcp_server, call_tool_json):
+    with (
+        patch("rubin.server._SNAPSHOT_LIMIT", 2),
+        patch.dict("rubin.server._snapshots", clear=True),
+    ):
+        for name in ("old", "kept", "new"):
+            await mcp_server.call_tool(
+                "capture_snapshot", {"name": name, "duration": 0.5}
+            )
+        assert await call_tool_json("list_snapshots", {}) == ["kept", "new"]
 
 
 @pytest.mark.anyio
-async def test_compare_snapshots_missing(mcp_server):
-    content, _ = await mcp_server.call_tool(
+async def test_compare_snapshots_missing(call_tool_json):
+    result = await call_tool_json(
         "compare_snapshots", {"name_a": "nope", "name_b": "also_nope"}
     )
-    result = json.loads(content[0].text)
     assert "error" in result
 
 
 @pytest.mark.anyio
-async def test_suggest_adjustments(fake_client, mcp_server):
-    content, _ = await mcp_server.call_tool(
+@pytest.mark.schema_only
+async def test_suggest_adjustments(fake_client, call_tool_json):
+    result = await call_tool_json(
         "suggest_adjustments", {"style": "synthpop", "duration": 1.0}
     )
-    result = json.loads(content[0].text)
     assert "style" in result
     assert "cohesion_score" in result
     assert "suggestions" in result
@@ -88,9 +110,9 @@ async def test_suggest_adjustments(fake_client, mcp_server):
 
 
 @pytest.mark.anyio
-async def test_create_style(mcp_server, tmp_path):
+async def test_create_style(call_tool_json, tmp_path):
     with patch("rubin.evaluator.USER_STYLES_DIR", tmp_path):
-        content, _ = await mcp_server.call_tool(
+        result = await call_tool_json(
             "create_style",
             {
                 "name": "dreampop",
@@ -102,14 +124,13 @@ async def test_create_style(mcp_server, tmp_path):
                 "brightness": {"low": 1500, "high": 4000},
             },
         )
-        result = json.loads(content[0].text)
         assert result["status"] == "created"
         assert result["profile"] == "dreampop"
         assert (tmp_path / "dreampop.json").exists()
 
 
 @pytest.mark.anyio
-async def test_update_style(mcp_server, tmp_path):
+async def test_update_style(mcp_server, tmp_path, call_tool_json):
     with patch("rubin.evaluator.USER_STYLES_DIR", tmp_path):
         # Create first
         await mcp_server.call_tool(
@@ -117,11 +138,10 @@ async def test_update_style(mcp_server, tmp_path):
             {"name": "test-update", "description": "Original"},
         )
         # Update
-        content, _ = await mcp_server.call_tool(
+        result = await call_tool_json(
             "update_style",
             {"name": "test-update", "description": "Updated description"},
         )
-        result = json.loads(content[0].text)
         assert result["status"] == "updated"
         # Verify the update persisted
         data = json.loads((tmp_path / "test-update.json").read_text())
@@ -129,46 +149,43 @@ async def test_update_style(mcp_server, tmp_path):
 
 
 @pytest.mark.anyio
-async def test_update_builtin_creates_override(mcp_server, tmp_path):
+async def test_update_builtin_creates_override(call_tool_json, tmp_path):
     """Updating a built-in style creates a user override."""
     with patch("rubin.evaluator.USER_STYLES_DIR", tmp_path):
-        content, _ = await mcp_server.call_tool(
+        result = await call_tool_json(
             "update_style",
             {"name": "ambient", "description": "My custom ambient"},
         )
-        result = json.loads(content[0].text)
         assert result["status"] == "updated"
         assert (tmp_path / "ambient.json").exists()
 
 
 @pytest.mark.anyio
-async def test_delete_style(mcp_server, tmp_path):
+async def test_delete_style(mcp_server, tmp_path, call_tool_json):
     with patch("rubin.evaluator.USER_STYLES_DIR", tmp_path):
         # Create then delete
         await mcp_server.call_tool(
             "create_style",
             {"name": "temp-style", "description": "Temporary"},
         )
-        content, _ = await mcp_server.call_tool("delete_style", {"name": "temp-style"})
-        result = json.loads(content[0].text)
+        result = await call_tool_json("delete_style", {"name": "temp-style"})
         assert result["status"] == "deleted"
         assert not (tmp_path / "temp-style.json").exists()
 
 
 @pytest.mark.anyio
-async def test_delete_builtin_refused(mcp_server, tmp_path):
+async def test_delete_builtin_refused(call_tool_json, tmp_path):
     with patch("rubin.evaluator.USER_STYLES_DIR", tmp_path):
-        content, _ = await mcp_server.call_tool("delete_style", {"name": "ambient"})
-        result = json.loads(content[0].text)
+        result = await call_tool_json("delete_style", {"name": "ambient"})
         assert "error" in result
 
 
 @pytest.mark.anyio
-async def test_audition_track(fake_client, mcp_server):
-    content, _ = await mcp_server.call_tool(
+@pytest.mark.schema_only
+async def test_audition_track(fake_client, call_tool_json):
+    result = await call_tool_json(
         "audition_track", {"style": "techno", "duration": 1.0}
     )
-    result = json.loads(content[0].text)
     assert "role" in result
     assert "fit_score" in result
     assert "dominant_bands" in result
@@ -179,18 +196,17 @@ async def test_audition_track(fake_client, mcp_server):
 
 
 @pytest.mark.anyio
-async def test_audition_track_with_role(fake_client, mcp_server):
-    content, _ = await mcp_server.call_tool(
+@pytest.mark.schema_only
+async def test_audition_track_with_role(fake_client, call_tool_json):
+    result = await call_tool_json(
         "audition_track", {"style": "ambient", "role": "pad", "duration": 1.0}
     )
-    result = json.loads(content[0].text)
     assert result["role"] == "pad"
 
 
 @pytest.mark.anyio
-async def test_audition_track_invalid_role(mcp_server):
-    content, _ = await mcp_server.call_tool(
+async def test_audition_track_invalid_role(call_tool_json):
+    result = await call_tool_json(
         "audition_track", {"style": "ambient", "role": "invalid"}
     )
-    result = json.loads(content[0].text)
     assert "error" in result